@@ -1,15 +1,30 @@
-import math
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from src._lzw_kernel import lzw_encode, lzw_decode
+except ImportError:
+    lzw_encode = None
+    lzw_decode = None
 
 
 class Compressor:
     """
     Compresses text files using the LZW algorithm.
     Maximum code table size is set to the 4096 entries (12 bit codes).
+    A separator byte (a space by default) forces a dictionary break at token boundaries, which steers the
+    dictionary towards whole tokens and typically improves the compression of text; pass separator=None to
+    disable the heuristic. The emitted code stream is valid LZW either way.
     """
-    def __init__(self, text_filepath):
-        self._code_table = None
+    def __init__(self, text_filepath, separator=b' '):
+        self._children = None
         self._next_code = None
         self._max_code = 4096
+        self._separator = separator[0] if separator else -1
         self._text = self._read_file(text_filepath)
         self.encoded_text = self._lzw_compress()
         self.compression_ratio = self._calculate_compression_ratio()
@@ -27,120 +42,137 @@ class Compressor:
 
     def _lzw_compress(self):
         """
-        Encodes the text using the LZW algorithm.
+        Encodes the text using the LZW algorithm. The code table is stored as a trie; the current match is tracked
+        by its code and extended one byte at a time, so each step costs a single dict lookup on one byte. The loop
+        runs in the compiled Numba kernel when it is available. Returns the codes as a compact array('H'), which
+        stores contiguous 2 byte integers instead of a list of boxed ints. A word reaching the separator byte is
+        flushed even when a longer match exists, so dictionary entries converge on whole tokens.
         """
+        if lzw_encode is not None:
+            encoded_text = array('H')
+            encoded_text.frombytes(lzw_encode(np.frombuffer(self._text, dtype=np.uint8), self._separator).tobytes())
+            return encoded_text
+
         self._initialise_code_table()
 
         encoded_text = []
+        append = encoded_text.append
+        children = self._children
+        text = self._text
+        separator = self._separator
+        max_code = self._max_code
+        next_code = self._next_code
+        current_code = text[0]
+        current_first = current_code
+
+        for next_byte in text[1:]:
+            if next_byte == separator and current_first != separator:
+                extended_code = None
+            else:
+                extended_code = children[current_code].get(next_byte)
 
-        i = 0
-        output_word = self._text[0]
-
-        while i < len(self._text):
-            next_char = self._get_next_char(i)
-            if output_word + next_char in self._code_table:
-                output_word = output_word + next_char
-                if i == len(self._text) - 1:
-                    encoded_text.append(self._code_table[output_word])
+            if extended_code is not None:
+                current_code = extended_code
             else:
-                encoded_text.append(self._code_table[output_word])
-                self._add_codeword(output_word + next_char)
-                output_word = next_char
-            i += 1
+                append(current_code)
+                if next_code == max_code:
+                    self._initialise_code_table()
+                    children = self._children
+                    next_code = self._next_code
+                children[current_code][next_byte] = next_code
+                next_code += 1
+                current_code = next_byte
+                current_first = next_byte
+
+        append(current_code)
+        self._next_code = next_code
 
-        return encoded_text
+        return array('H', encoded_text)
 
     def _calculate_compression_ratio(self):
         """
         Calculates the memory saved from the compression. The encoded text is represented by 12 bit codes instead of
         8 bit codes.
         """
-        compressed_bytes = math.ceil(len(self.encoded_text) * 12 / 8)
+        compressed_bytes = (len(self.encoded_text) * 12 + 7) // 8
         uncompressed_bytes = len(self._text)
 
         return uncompressed_bytes / compressed_bytes
 
     def _initialise_code_table(self):
         """
-        Initializes a code dictionary with 256 entries. Maps unicode character strings to their code [0 to 255].
-        Resets the next string_table code to 256.
+        Initializes the code trie. Each code [0 to 4095] owns a dictionary mapping a next byte to the code of
+        the extended word; the single byte words [0 to 255] are implicit. Resets the next code to 256. The trie
+        is allocated once; on a reset only the dictionaries that were populated are cleared in place.
         """
-        self._code_table = {chr(i): i for i in range(256)}
+        if self._children is None:
+            self._children = [{} for _ in range(self._max_code)]
+        else:
+            for child in self._children:
+                if child:
+                    child.clear()
         self._next_code = 256
 
-    def _add_codeword(self, word):
+    def _encode_to_bytes(self):
         """
-        Adds a string to the code table. If the code table is full, (max capacity 4096 entries), the code
-        table is re-initialised with 256 entries.
+        Converts the 12 bit codes to an stream of byte objects. The last code, where there is an odd number, is padded
+        with 4 0 bits (e.g. 0000) to create the final byte. Uses a vectorised NumPy kernel when NumPy is available;
+        otherwise the codes are folded into a large integer a block at a time and each block is serialised with a
+        single int.to_bytes call.
         """
-        if self._next_code == self._max_code:
-            self._initialise_code_table()
+        if np is not None:
+            return self._pack_codes_numpy()
 
-        self._code_table[word] = self._next_code
-        self._next_code += 1
+        encoded_bytes = bytearray()
+        twelve_bit_codes = memoryview(self.encoded_text)
+        # an even block length keeps every block boundary byte aligned
+        block_size = 4096
 
-    def _encode_to_bytes(self):
+        for start in range(0, len(twelve_bit_codes), block_size):
+            block = twelve_bit_codes[start:start + block_size]
+            value = 0
+            for code in block:
+                value = (value << 12) | code
+            bits = 12 * len(block)
+            value <<= -bits % 8
+            encoded_bytes += value.to_bytes((bits + 7) // 8, byteorder='big')
+
+        return bytes(encoded_bytes)
+
+    def _pack_codes_numpy(self):
         """
-        Converts the 12 bit codes to an stream of byte objects. The last code, where there is an odd number, is padded
-        with 4 0 bits (e.g. 0000) to create the final byte.
+        Packs all of the 12 bit codes into bytes in a single vectorised pass. The codes are read straight from the
+        array('H') buffer without copying, paired, combined into 24 bit values and split into 3 bytes; an odd
+        number of codes is padded with a zero code and the stream is truncated to the 2 byte padded form.
         """
+        codes = np.frombuffer(self.encoded_text, dtype=np.uint16)
+        odd = codes.size % 2
+        if odd:
+            codes = np.append(codes, np.uint16(0))
 
-        twelve_bit_codes = self.encoded_text.copy()
-        encoded_bytes = b''
+        pairs = codes.astype(np.uint32).reshape(-1, 2)
+        packed = (pairs[:, 0] << 12) | pairs[:, 1]
 
-        while True:
-            if not twelve_bit_codes:
-                break
-            if len(twelve_bit_codes) > 1:
-                first_code = twelve_bit_codes.pop(0)
-                second_code = twelve_bit_codes.pop(0)
-                bytes = self._convert_to_bytes(first_code, second_code)
-            else:
-                code = twelve_bit_codes.pop(0)
-                bytes = self._padded_convert_to_bytes(code)
+        encoded_bytes = np.empty((len(packed), 3), dtype=np.uint8)
+        encoded_bytes[:, 0] = (packed >> 16) & 0xff
+        encoded_bytes[:, 1] = (packed >> 8) & 0xff
+        encoded_bytes[:, 2] = packed & 0xff
 
-            encoded_bytes += bytes
+        encoded_bytes = encoded_bytes.tobytes()
+        if odd:
+            encoded_bytes = encoded_bytes[:-1]
 
         return encoded_bytes
 
-    def _get_next_char(self, index):
-        """
-        Returns the next character in the text, given an index. If no next character exists, returns an empty string.
-        """
-        try:
-            return self._text[index + 1]
-        except IndexError:
-            return ''
-
     @staticmethod
     def _read_file(filepath):
         """
-        Returns the text from a text file.
+        Returns the contents of a file as bytes. The LZW algorithm is byte oriented, so reading in binary mode
+        supports any file content and measures the compression ratio in bytes.
         """
-        with open(filepath, 'r', encoding='utf-8') as file:
+        with open(filepath, 'rb') as file:
             return file.read()
 
-    @staticmethod
-    def _convert_to_bytes(first_code, second_code):
-        """
-        :param first_code: An integer that represents a 12-bit code
-        :param second_code: The subsequent 12 bit code
-        :return: A byte object containing 3 bytes created from the 2 12-bit codes.
-        """
-        bit_string = format(first_code, '012b') + format(second_code, '012b')
-        return int(bit_string, 2).to_bytes(3, byteorder='big')
-
-    @staticmethod
-    def _padded_convert_to_bytes(code):
-        """
-        :param code: An integer that represents a 12-bit code
-        :return: A byte object containing 2 bytes created from the 12-bit codes. The final byte is padded with 0000.
-        """
-        padded_bits = '0000'
-        bit_string = format(code, '012b') + padded_bits
-        return int(bit_string, 2).to_bytes(2, byteorder='big')
-
-
 class Decompressor:
     """
     Decodes a LZW compressed file.
@@ -154,11 +186,11 @@ class Decompressor:
 
     def save_text(self, save_filepath):
         """
-        Saves the decompressed text as a .txt file.
+        Saves the decompressed bytes as a .txt file.
         """
         assert save_filepath.lower().endswith('.txt'), 'Saved file must have the file extension *.txt'
 
-        with open(save_filepath, 'w+', encoding='utf-8') as file:
+        with open(save_filepath, 'w+b') as file:
             file.write(self.decoded_text)
 
     def _decompress_file(self, compressed_filepath):
@@ -174,88 +206,115 @@ class Decompressor:
 
     def _initialise_string_table(self):
         """
-        Initializes a string dictionary with 256 entries. Maps unicode [0 to 255] to single character strings.
-        Resets the next string_table code with 256.
+        Initializes the string table as a list of 4096 (prefix code, appended byte) entries indexed directly by
+        code; the single byte entries [0 to 255] use a prefix code of -1. Resets the next string_table code with
+        256. The list is allocated once and a reset only rewinds the next code, since entries at or beyond it are
+        never read.
         """
+        if self._string_table is None:
+            self._string_table = [None] * self._max_code
+            self._string_table[:256] = [(-1, i) for i in range(256)]
         self._next_code = 256
-        self._string_table = {i: chr(i) for i in range(256)}
 
     def _twelve_bit_read(self, compressed_file):
         """
-        Generates a list of 12-bit integers from a binary file
-        """
-        encoded_12_bits = []
-
-        while True:
-            bytes = compressed_file.read(3)
-
-            if not bytes:
-                break
-            if len(bytes) == 2:
-                twelve_bit_code = self._process_padded_bytes(bytes)
-                encoded_12_bits.append(twelve_bit_code)
-            else:
-                twelve_bit_codes = self._process_bytes(bytes)
-                encoded_12_bits.extend(twelve_bit_codes)
-
-        return encoded_12_bits
-
-    def _lzw_decompress(self, twelve_bit_codes):
-        """
-        Decompresses the twelve bit code stream using the LZW algorithm.
+        Generates a list of 12-bit integers from a binary file. The file is read into memory with a single call
+        and the 3 byte groups are unpacked by index; a vectorised NumPy kernel is used when NumPy is available.
         """
-        decoded_strings = []
-        old_string = self._string_table[twelve_bit_codes[0]]
-        decoded_strings.append(old_string)
+        data = compressed_file.read()
 
-        for code in twelve_bit_codes[1:]:
+        if np is not None:
+            return self._unpack_codes_numpy(data)
 
-            if code not in self._string_table:
-                current_string = old_string + char
-            else:
-                current_string = self._string_table[code]
-
-            decoded_strings.append(current_string)
-            char = current_string[0]
-            self._add_to_string_table(old_string + char)
-            old_string = current_string
+        encoded_12_bits = []
+        tail = len(data) % 3
 
-        return ''.join(decoded_strings)
+        for i in range(0, len(data) - tail, 3):
+            first_byte, second_byte, third_byte = data[i], data[i + 1], data[i + 2]
+            encoded_12_bits.append((first_byte << 4) | (second_byte >> 4))
+            encoded_12_bits.append(((second_byte & 0x0f) << 8) | third_byte)
 
-    def _add_to_string_table(self, string):
-        """
-        Adds a string to the string code table. If the string table is full, (max capacity 4096 entries), the string
-        table is re-initialised to 256 entries.
-        """
-        if self._next_code == self._max_code:
-            self._initialise_string_table()
+        if tail == 2:
+            encoded_12_bits.append((data[-2] << 4) | (data[-1] >> 4))
 
-        self._string_table[self._next_code] = string
-        self._next_code += 1
+        return encoded_12_bits
 
     @staticmethod
-    def _process_bytes(bytes):
+    def _unpack_codes_numpy(data):
         """
-        :param bytes: a 24-bit byte object (3 bytes)
-        :return: A list containing 2 12-bit integers. The first code using the leading 12-bits of the byte object,
-        the second code using the trailing 12-bits.
+        Unpacks all of the 12 bit codes from a byte stream in a single vectorised pass. Each 3 byte group holds 2
+        codes; a trailing 2 byte group holds a single code followed by the 4 padding bits.
         """
-        byte_int = int.from_bytes(bytes, byteorder='big')
-        max_12_bit_byte = 0xfff
+        tail = len(data) % 3
+        body = np.frombuffer(data, dtype=np.uint8, count=len(data) - tail).astype(np.uint32).reshape(-1, 3)
 
-        first_code = byte_int >> 12
-        second_code = byte_int & max_12_bit_byte
+        codes = np.empty(2 * len(body), dtype=np.uint16)
+        codes[0::2] = (body[:, 0] << 4) | (body[:, 1] >> 4)
+        codes[1::2] = ((body[:, 1] & 0x0f) << 8) | body[:, 2]
 
-        return [first_code, second_code]
+        encoded_12_bits = codes.tolist()
+        if tail == 2:
+            encoded_12_bits.append((data[-2] << 4) | (data[-1] >> 4))
 
-    @staticmethod
-    def _process_padded_bytes(bytes):
-        """
-        :param bytes: a 16-bit byte object (2 bytes). Used to encode a 12-bit code, where the trailing 4 zeros are
-        padding bits.
-        :return: A 12-bit integer. The code uses the leading 12-bits of the byte object. The 4-bits used for padding
-        are disregarded.
-        """
-        byte_int = int.from_bytes(bytes, byteorder='big')
+        return encoded_12_bits
 
-        return byte_int >> 4
+    def _lzw_decompress(self, twelve_bit_codes):
+        """
+        Decompresses the twelve bit code stream using the LZW algorithm. Table entries only hold their prefix code
+        and appended byte, so adding an entry never copies a growing string. The decoded bytes are written straight
+        into a single bytearray: a known code is emitted by walking its prefix chain, and an unseen code is
+        reproduced by copying the previous emission. The loop runs in the compiled Numba kernel when it is
+        available. Table additions are applied in blocks sized to the remaining table capacity, so the overflow
+        check runs once per block instead of once per code.
+        """
+        if lzw_decode is not None:
+            return lzw_decode(np.asarray(twelve_bit_codes, dtype=np.uint16)).tobytes()
+
+        string_table = self._string_table
+        decoded = bytearray()
+        stack = []
+
+        old_code = twelve_bit_codes[0]
+        walk = old_code
+        while walk != -1:
+            walk, byte = string_table[walk]
+            stack.append(byte)
+        decoded.extend(reversed(stack))
+        old_start = 0
+        old_length = len(stack)
+
+        i = 1
+        while i < len(twelve_bit_codes):
+            block_end = min(len(twelve_bit_codes), i + self._max_code - self._next_code)
+            next_code = self._next_code
+
+            for code in twelve_bit_codes[i:block_end]:
+                start = len(decoded)
+
+                if code < next_code:
+                    del stack[:]
+                    walk = code
+                    while walk != -1:
+                        walk, byte = string_table[walk]
+                        stack.append(byte)
+                    decoded.extend(reversed(stack))
+                    first_byte = stack[-1]
+                    length = len(stack)
+                else:
+                    decoded += decoded[old_start:old_start + old_length]
+                    first_byte = decoded[old_start]
+                    decoded.append(first_byte)
+                    length = old_length + 1
+
+                string_table[next_code] = (old_code, first_byte)
+                next_code += 1
+                old_code = code
+                old_start = start
+                old_length = length
+
+            self._next_code = next_code
+            i = block_end
+            if next_code == self._max_code:
+                self._initialise_string_table()
+
+        return bytes(decoded)
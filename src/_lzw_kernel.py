@@ -0,0 +1,133 @@
+"""
+Optional Numba compiled kernels for the LZW hot loops. Importing this module requires NumPy and Numba;
+src.LZW imports it guardedly and falls back to the pure Python loops when it is unavailable.
+"""
+import numpy as np
+from numba import njit, types
+from numba.typed import Dict
+
+MAX_CODE = 4096
+
+
+@njit(cache=True)
+def lzw_encode(data, separator):
+    """
+    Encodes a uint8 array into a uint16 array of 12 bit LZW codes. Mirrors Compressor._lzw_compress: the code
+    trie is flattened into a dictionary keyed by (current code << 8) | next byte and is re-initialised once all
+    4096 codes are used. A word reaching the separator byte is flushed even when a longer match exists; pass -1
+    to disable the heuristic.
+    """
+    if data.size == 0:
+        return np.empty(0, dtype=np.uint16)
+
+    encoded = np.empty(data.size, dtype=np.uint16)
+    n_codes = 0
+
+    table = Dict.empty(key_type=types.int64, value_type=types.int64)
+    next_code = 256
+    current_code = np.int64(data[0])
+    current_first = current_code
+
+    for i in range(1, data.size):
+        next_byte = np.int64(data[i])
+        key = (current_code << 8) | next_byte
+        if key in table and not (next_byte == separator and current_first != separator):
+            current_code = table[key]
+        else:
+            encoded[n_codes] = current_code
+            n_codes += 1
+            if next_code == MAX_CODE:
+                table = Dict.empty(key_type=types.int64, value_type=types.int64)
+                next_code = 256
+            table[key] = next_code
+            next_code += 1
+            current_code = next_byte
+            current_first = next_byte
+
+    encoded[n_codes] = current_code
+    n_codes += 1
+
+    return encoded[:n_codes]
+
+
+@njit(cache=True)
+def lzw_decode(codes):
+    """
+    Decodes a uint16 array of 12 bit LZW codes into a uint8 array. Mirrors Decompressor._lzw_decompress: table
+    entries are (prefix code, appended byte) pairs held in parallel arrays and strings are materialised by
+    walking the prefix chain; an unseen code is reconstructed from the previous emission.
+    """
+    if codes.size == 0:
+        return np.empty(0, dtype=np.uint8)
+
+    prefix = np.empty(MAX_CODE, dtype=np.int64)
+    appended = np.empty(MAX_CODE, dtype=np.uint8)
+    for i in range(256):
+        prefix[i] = -1
+        appended[i] = i
+    next_code = 256
+
+    out = np.empty(max(codes.size * 2, 16), dtype=np.uint8)
+    out_len = 0
+    stack = np.empty(MAX_CODE, dtype=np.uint8)
+
+    old_code = np.int64(codes[0])
+    depth = 0
+    walk = old_code
+    while walk != -1:
+        stack[depth] = appended[walk]
+        depth += 1
+        walk = prefix[walk]
+    for j in range(depth):
+        out[out_len] = stack[depth - 1 - j]
+        out_len += 1
+    old_start = 0
+    old_len = depth
+
+    for i in range(1, codes.size):
+        code = np.int64(codes[i])
+
+        if code < next_code:
+            depth = 0
+            walk = code
+            while walk != -1:
+                stack[depth] = appended[walk]
+                depth += 1
+                walk = prefix[walk]
+            first_byte = stack[depth - 1]
+            length = depth
+        else:
+            first_byte = out[old_start]
+            length = old_len + 1
+
+        if out_len + length > out.size:
+            new_size = out.size * 2
+            while new_size < out_len + length:
+                new_size *= 2
+            grown = np.empty(new_size, dtype=np.uint8)
+            grown[:out_len] = out[:out_len]
+            out = grown
+
+        start = out_len
+        if code < next_code:
+            for j in range(depth):
+                out[out_len] = stack[depth - 1 - j]
+                out_len += 1
+        else:
+            for j in range(old_len):
+                out[out_len] = out[old_start + j]
+                out_len += 1
+            out[out_len] = first_byte
+            out_len += 1
+
+        if next_code == MAX_CODE:
+            next_code = 256
+        prefix[next_code] = old_code
+        appended[next_code] = first_byte
+        next_code += 1
+
+        old_code = code
+        old_start = start
+        old_len = length
+
+    return out[:out_len]